@@ -5,11 +5,15 @@ MongoDB helper functions ready to use in your backend code.
 Import and use these functions in your API endpoints for database operations.
 """
 
-from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import WriteConcern
+from pymongo.errors import BulkWriteError
+from bson import ObjectId, encode
+from bson.raw_bson import RawBSONDocument
 from datetime import datetime, timezone
 import os
 from dotenv import load_dotenv
-from typing import Union
+from typing import List, Tuple, Union
 from pydantic import BaseModel
 
 # Load environment variables from .env file
@@ -21,29 +25,73 @@ db = None
 database_url = os.getenv("DATABASE_URL")
 database_name = os.getenv("DATABASE_NAME")
 
+# Single client shared by every request; pool sized for one uvicorn worker
 if database_url and database_name:
-    _client = MongoClient(database_url)
+    _client = AsyncIOMotorClient(
+        database_url,
+        maxPoolSize=20,
+        minPoolSize=5,
+        waitQueueTimeoutMS=5000,
+        appname="drumkits-api",
+    )
     db = _client[database_name]
 
-# Helper functions for common database operations
-def create_document(collection_name: str, data: Union[BaseModel, dict]):
-    """Insert a single document with timestamp"""
-    if db is None:
-        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+class BulkInsertError(Exception):
+    """Some documents of an unordered batch failed; document_ids follow input order, details is the server report"""
+    def __init__(self, document_ids: List[str], details: dict):
+        super().__init__(f"{len(details.get('writeErrors', []))} of {len(document_ids)} documents failed to insert")
+        self.document_ids = document_ids
+        self.details = details
 
+def _to_raw_bson(data: Union[BaseModel, dict], now: datetime) -> Tuple[RawBSONDocument, ObjectId]:
+    """Add _id and timestamps, then encode to BSON once so the driver sends the bytes as-is"""
     # Convert Pydantic model to dict if needed
     if isinstance(data, BaseModel):
-        data_dict = data.model_dump()
+        data_dict = data.model_dump(mode="python", exclude_none=True)
     else:
         data_dict = data.copy()
 
-    data_dict['created_at'] = datetime.now(timezone.utc)
-    data_dict['updated_at'] = datetime.now(timezone.utc)
+    # The driver cannot add an _id to a raw document, so assign it here
+    _id = data_dict.setdefault('_id', ObjectId())
+    data_dict['created_at'] = now
+    data_dict['updated_at'] = now
+    # Return the _id too: reading a key from a RawBSONDocument decodes the whole document
+    return RawBSONDocument(encode(data_dict)), _id
+
+# Helper functions for common database operations
+async def create_document(collection_name: str, data: Union[BaseModel, dict]):
+    """Insert a single document with timestamp"""
+    if db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    document, _id = _to_raw_bson(data, datetime.now(timezone.utc))
+    await db[collection_name].insert_one(document)
+    return str(_id)
+
+async def create_documents(collection_name: str, data_list: List[Union[BaseModel, dict]], acknowledged: bool = True):
+    """Insert many documents with timestamps in one unordered batch (w=0 when not acknowledged)"""
+    if db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+    if not data_list:
+        return []
+
+    now = datetime.now(timezone.utc)
+    encoded = [_to_raw_bson(data, now) for data in data_list]
+    docs = [document for document, _ in encoded]
+
+    collection = db[collection_name]
+    if not acknowledged:
+        collection = db.get_collection(collection_name, write_concern=WriteConcern(w=0))
 
-    result = db[collection_name].insert_one(data_dict)
-    return str(result.inserted_id)
+    ids = [str(_id) for _, _id in encoded]
+    try:
+        await collection.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        # Unordered batch: the documents without a write error were still inserted
+        raise BulkInsertError(ids, e.details) from e
+    return ids
 
-def get_documents(collection_name: str, filter_dict: dict = None, limit: int = None):
+async def get_documents(collection_name: str, filter_dict: dict = None, limit: int = None):
     """Get documents from collection"""
     if db is None:
         raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
@@ -52,4 +100,4 @@ def get_documents(collection_name: str, filter_dict: dict = None, limit: int = N
     if limit:
         cursor = cursor.limit(limit)
     
-    return list(cursor)
+    return await cursor.to_list(length=None)
@@ -1,45 +1,129 @@
 import os
-from datetime import datetime, timezone
-from typing import List, Optional
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Query
+import time
+import asyncio
+import logging
+import anyio
+import orjson
+from pymongo.errors import DuplicateKeyError
+from typing import List
+from fastapi import APIRouter, FastAPI, HTTPException, Request, UploadFile, File, Form, Query
+from fastapi.exceptions import RequestValidationError
+from fastapi.exception_handlers import request_validation_exception_handler
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import APIRoute
 from pydantic import BaseModel, Field
-from database import db, create_document, get_documents
-from schemas import Drumkit, Collaborator
+from database import db, create_document, create_documents, get_documents, BulkInsertError
+from schemas.core import Drumkit
+from pricing import compute_price, is_in_past_minute, PricingError
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
+logger = logging.getLogger("uvicorn.error")
+
+# Comma-separated list of allowed frontend origins; falls back to any origin when unset
+FRONTEND_ORIGINS = [o.strip() for o in os.getenv("FRONTEND_ORIGINS", "").split(",") if o.strip()] or ["*"]
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=FRONTEND_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type", "authorization"],
+    max_age=86400,
 )
 
+@app.on_event("startup")
+async def warn_on_wildcard_cors():
+    if FRONTEND_ORIGINS == ["*"]:
+        logger.warning("FRONTEND_ORIGINS is not set: CORS allows any origin with credentials")
+
+@app.on_event("startup")
+async def widen_threadpool():
+    # Sync handlers run in anyio's default thread limiter (40 tokens); allow more concurrent calls
+    anyio.to_thread.current_default_thread_limiter().total_tokens = 100
+
+# Startup database calls are bounded so an unreachable Mongo does not hold the worker closed
+# for the driver's 30s server selection timeout
+_STARTUP_DB_TIMEOUT_SECONDS = 2.0
+
+@app.on_event("startup")
+async def warm_up_database():
+    # Ping once at startup so the connection pool is open before the first request
+    if db is None:
+        return
+    try:
+        await asyncio.wait_for(db.command("ping"), _STARTUP_DB_TIMEOUT_SECONDS)
+    except Exception as e:
+        logger.warning("Database ping failed on startup: %r", e)
+
+@app.on_event("startup")
+async def ensure_indexes():
+    # Duplicate titles per owner are rejected by the server instead of a find_one before each insert
+    if db is None:
+        return
+    try:
+        await asyncio.wait_for(
+            db["drumkit"].create_index([("owner_username", 1), ("title", 1)], unique=True),
+            _STARTUP_DB_TIMEOUT_SECONDS,
+        )
+    except Exception as e:
+        logger.warning("Could not create drumkit indexes: %r", e)
+
+def _is_tags_error(loc) -> bool:
+    # Matches ("body", "tags", ...) for single bodies and ("body", <index>, "tags", ...) for list bodies
+    loc = tuple(loc)
+    if loc[:2] == ("body", "tags"):
+        return True
+    return len(loc) >= 3 and loc[0] == "body" and isinstance(loc[1], int) and loc[2] == "tags"
+
+# Tag limits are enforced by the schema; keep the original 400 + Spanish message for clients
+# when tags are the only problem, otherwise report every error through the default 422
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    errors = exc.errors()
+    if errors and all(_is_tags_error(err["loc"]) for err in errors):
+        return ORJSONResponse({"detail": "Tags inválidos (max 3, cada uno max 15 caracteres)"}, status_code=400)
+    return await request_validation_exception_handler(request, exc)
+
 @app.get("/")
 def read_root():
     return {"message": "Drumkits API ready"}
 
+# Collection names change rarely; cache them so /test can be used as a probe without hitting Mongo
+_COLLECTIONS_TTL_SECONDS = 30.0
+_collections_cache = {"expires_at": 0.0, "names": None}
+
+async def _list_collections():
+    now = time.monotonic()
+    if _collections_cache["names"] is None or now >= _collections_cache["expires_at"]:
+        _collections_cache["names"] = await db.list_collection_names()
+        _collections_cache["expires_at"] = now + _COLLECTIONS_TTL_SECONDS
+    return _collections_cache["names"]
+
+# Environment is read once at import; /test copies this template per call
+_DATABASE_URL_STATUS = "✅ Set" if os.getenv("DATABASE_URL") else "❌ Not Set"
+_DATABASE_NAME = os.getenv("DATABASE_NAME") or "❌ Not Set"
+_TEST_RESPONSE_TEMPLATE = {
+    "backend": "✅ Running",
+    "database": "❌ Not Available",
+    "database_url": None,
+    "database_name": None,
+    "connection_status": "Not Connected",
+    "collections": (),
+}
+
 @app.get("/test")
-def test_database():
-    response = {
-        "backend": "✅ Running",
-        "database": "❌ Not Available",
-        "database_url": None,
-        "database_name": None,
-        "connection_status": "Not Connected",
-        "collections": []
-    }
+async def test_database():
+    response = _TEST_RESPONSE_TEMPLATE.copy()
 
     try:
         if db is not None:
             response["database"] = "✅ Available"
-            response["database_url"] = "✅ Set" if os.getenv("DATABASE_URL") else "❌ Not Set"
-            response["database_name"] = os.getenv("DATABASE_NAME") or "❌ Not Set"
+            response["database_url"] = _DATABASE_URL_STATUS
+            response["database_name"] = _DATABASE_NAME
             response["connection_status"] = "Connected"
             try:
-                collections = db.list_collection_names()
+                collections = await _list_collections()
                 response["collections"] = collections[:10]
                 response["database"] = "✅ Connected & Working"
             except Exception as e:
@@ -58,87 +142,114 @@ def validate_username(username: str = Query(..., min_length=3, max_length=32)):
     # If there is a users collection, we could query it. For now return ok.
     return {"username": username, "exists": True}
 
-# Create Drumkit endpoint
-class DrumkitCreate(BaseModel):
-    # Archivos: we will receive URLs/paths already uploaded (file upload UI will be client-only in this MVP)
-    archive_url: Optional[str] = None
-    preview_urls: List[str] = Field(default_factory=list)
-    cover_url: Optional[str] = None
+class ORJSONRoute(APIRoute):
+    """Route that parses JSON bodies with orjson before FastAPI validates them"""
+
+    def get_route_handler(self):
+        original_route_handler = super().get_route_handler()
 
-    title: str = Field(..., max_length=60)
-    release_at: str  # ISO string from client; will be parsed and validated server-side
-    description: Optional[str] = Field(None, max_length=500)
-    visibility: str = Field(..., pattern="^(privado|publico|no_listado)$")
+        async def route_handler(request: Request):
+            body = await request.body()
+            if body and "json" in request.headers.get("content-type", ""):
+                try:
+                    # Starlette's Request.json() returns the cached _json without re-parsing
+                    request._json = orjson.loads(body)
+                except orjson.JSONDecodeError:
+                    pass  # let FastAPI parse again and build its usual 422 response
+            return await original_route_handler(request)
 
-    tags: List[str] = Field(default_factory=list)
-    sounds_count: int = Field(..., ge=0, le=999)
+        return route_handler
 
-    price_original: float = Field(..., ge=1.0, le=1000.0)
-    is_free: bool = False
-    offer_fixed: Optional[float] = Field(None, ge=0.0)
-    offer_percent: Optional[int] = Field(None, ge=0, le=90)
+router = APIRouter(route_class=ORJSONRoute)
 
-    owner_username: str = Field(..., max_length=32)
-    collaborators: List[Collaborator] = Field(default_factory=list)
+# Create Drumkit endpoint
+class DrumkitIn(Drumkit):
+    """Request body: the stored Drumkit schema, with price_final computed server-side"""
+    price_final: float = Field(0.0, ge=0.0)
 
 class DrumkitResponse(BaseModel):
     id: str
 
-@app.post("/drumkits", response_model=DrumkitResponse)
-def create_drumkit(payload: DrumkitCreate):
-    # Validate constraints not covered by schema
-    # Tags: max 3 and each <= 15 chars
-    if len(payload.tags) > 3 or any(len(t) > 15 for t in payload.tags):
-        raise HTTPException(status_code=400, detail="Tags inválidos (max 3, cada uno max 15 caracteres)")
+class DrumkitBulkResponse(BaseModel):
+    ids: List[str]
+
+class DrumkitBulkConflictResponse(BaseModel):
+    detail: str
+    ids: List[str]  # items that were stored
+    failed_indexes: List[int]  # positions in the request body that were not stored
 
+def build_drumkit(payload: DrumkitIn) -> Drumkit:
+    """Apply pricing and release date rules to a validated payload, updating it in place"""
     # Pricing logic
-    if payload.is_free:
-        final_price = 0.0
-        offer_fixed = None
-        offer_percent = None
-    else:
-        offer_fixed = payload.offer_fixed
-        offer_percent = payload.offer_percent
-        if offer_fixed is not None and offer_fixed >= payload.price_original:
-            raise HTTPException(status_code=400, detail="La oferta fija no puede ser mayor o igual al precio original")
-        if offer_percent is not None and offer_percent > 90:
-            raise HTTPException(status_code=400, detail="El porcentaje de oferta no puede ser mayor a 90%")
-        # Calculate final price
-        final_price = payload.price_original
-        if offer_fixed is not None:
-            final_price = payload.price_original - offer_fixed
-        elif offer_percent is not None:
-            final_price = payload.price_original * (1 - offer_percent/100)
-        final_price = max(final_price, 0.0)
+    try:
+        final_price, offer_fixed, offer_percent = compute_price(
+            payload.price_original, payload.is_free, payload.offer_fixed, payload.offer_percent
+        )
+    except PricingError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     # Release date validation: must be now at same minute or future within same minute rule
+    # If user specified a time earlier than now (minute precision), raise error
+    if is_in_past_minute(payload.release_at):
+        raise HTTPException(status_code=400, detail="La hora de lanzamiento ya pasó. Configura otra hora.")
+
+    # The body was validated once against the Drumkit schema; store it without building a second model
+    payload.offer_fixed = offer_fixed
+    payload.offer_percent = offer_percent
+    payload.price_final = final_price
+    return payload
+
+# DrumkitResponse is only used for the OpenAPI docs; the handler returns the response directly
+@router.post("/drumkits", status_code=201, responses={201: {"model": DrumkitResponse}})
+async def create_drumkit(payload: DrumkitIn):
+    drumkit_doc = build_drumkit(payload)
+    try:
+        new_id = await create_document("drumkit", drumkit_doc)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="Título ya existe para este usuario")
+    return ORJSONResponse({"id": new_id}, status_code=201)
+
+# Bulk create: every item is checked before anything is written; fast=true is opt-in and sends
+# an unacknowledged insert (w=0), so the returned ids are not confirmed and failures are not reported
+_BULK_MAX_ITEMS = 100
+
+@router.post(
+    "/drumkits/bulk",
+    status_code=201,
+    responses={
+        201: {"model": DrumkitBulkResponse},
+        409: {"model": DrumkitBulkConflictResponse},
+        500: {"model": DrumkitBulkConflictResponse},
+    },
+)
+async def create_drumkits_bulk(payloads: List[DrumkitIn], fast: bool = Query(False)):
+    # Checked by hand: FastAPI 0.104 drops conlist's max_length on body parameters
+    if len(payloads) > _BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Máximo {_BULK_MAX_ITEMS} drumkits por solicitud")
+    drumkit_docs = []
+    for i, payload in enumerate(payloads):
+        try:
+            drumkit_docs.append(build_drumkit(payload))
+        except HTTPException as e:
+            # Same rules as POST /drumkits, but say which item of the batch failed
+            raise HTTPException(status_code=e.status_code, detail={"index": i, "detail": e.detail})
     try:
-        client_dt = datetime.fromisoformat(payload.release_at.replace("Z", "+00:00"))
-        now = datetime.now(timezone.utc)
-        # If user specified a time earlier than now (minute precision), raise error
-        if client_dt.replace(second=0, microsecond=0) < now.replace(second=0, microsecond=0):
-            raise HTTPException(status_code=400, detail="La hora de lanzamiento ya pasó. Configura otra hora.")
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Fecha de lanzamiento inválida")
-
-    drumkit_doc = Drumkit(
-        archive_url=payload.archive_url,
-        preview_urls=payload.preview_urls,
-        cover_url=payload.cover_url,
-        title=payload.title,
-        release_at=client_dt,
-        description=payload.description,
-        visibility=payload.visibility,  # type: ignore
-        tags=payload.tags,
-        sounds_count=payload.sounds_count,
-        price_original=payload.price_original,
-        is_free=payload.is_free,
-        offer_fixed=offer_fixed,
-        offer_percent=offer_percent,
-        price_final=final_price,
-        owner_username=payload.owner_username,
-        collaborators=payload.collaborators,
-    )
-
-    new_id = create_document("drumkit", drumkit_doc)
-    return {"id": new_id}
+        new_ids = await create_documents("drumkit", drumkit_docs, acknowledged=not fast)
+    except BulkInsertError as e:
+        write_errors = e.details.get("writeErrors", [])
+        failed_indexes = sorted(err["index"] for err in write_errors)
+        failed = set(failed_indexes)
+        body = {
+            "ids": [new_id for i, new_id in enumerate(e.document_ids) if i not in failed],
+            "failed_indexes": failed_indexes,
+        }
+        # Only duplicate titles are a client conflict; anything else is a server error, but the
+        # unordered batch may already have stored items, so report them either way
+        only_duplicates = write_errors and all(err.get("code") == 11000 for err in write_errors)
+        if not only_duplicates or e.details.get("writeConcernErrors"):
+            logger.error("Bulk drumkit insert failed: %r", e.details)
+            return ORJSONResponse({"detail": "Error al guardar los drumkits", **body}, status_code=500)
+        return ORJSONResponse({"detail": "Uno o más títulos ya existen para este usuario", **body}, status_code=409)
+    return ORJSONResponse({"ids": new_ids}, status_code=201)
+
+app.include_router(router)
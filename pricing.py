@@ -0,0 +1,47 @@
+"""
+Pricing Helpers
+
+Pure functions for drumkit pricing and release date rules. They raise PricingError
+instead of HTTPException so results can be cached; the API layer translates the error.
+
+Fully annotated so start_server.sh can compile this module with mypyc in multi-worker
+mode; in reload mode or when the build fails, the pure-Python module is imported.
+"""
+
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional, Tuple
+
+
+class PricingError(ValueError):
+    """Raised when an offer is not valid for the original price"""
+
+
+@lru_cache(maxsize=4096)
+def compute_price(
+    price_original: float,
+    is_free: bool,
+    offer_fixed: Optional[float],
+    offer_percent: Optional[int],
+) -> Tuple[float, Optional[float], Optional[int]]:
+    """Return (final_price, offer_fixed, offer_percent) after applying the offer rules"""
+    if is_free:
+        return 0.0, None, None
+
+    if offer_fixed is not None and offer_fixed >= price_original:
+        raise PricingError("La oferta fija no puede ser mayor o igual al precio original")
+    if offer_percent is not None and offer_percent > 90:
+        raise PricingError("El porcentaje de oferta no puede ser mayor a 90%")
+
+    final_price = price_original
+    if offer_fixed is not None:
+        final_price = price_original - offer_fixed
+    elif offer_percent is not None:
+        final_price = price_original * (1 - offer_percent/100)
+    return max(final_price, 0.0), offer_fixed, offer_percent
+
+
+def is_in_past_minute(client_dt: datetime) -> bool:
+    """True if client_dt falls in a minute earlier than the current one"""
+    return client_dt.timestamp() // 60 < time.time() // 60
@@ -0,0 +1,24 @@
+"""
+Database Schemas
+
+Define your MongoDB collection schemas here using Pydantic models.
+These schemas are used for data validation in your application.
+
+Each Pydantic model represents a collection in your database.
+Model name is converted to lowercase for the collection name:
+- User -> "user" collection
+- Product -> "product" collection
+- BlogPost -> "blogs" collection
+
+Schemas used by the API handlers live in schemas.core. schemas.users needs
+email-validator (EmailStr), so it is only imported when User is first accessed.
+"""
+
+from .core import Collaborator, Drumkit, Product
+
+
+def __getattr__(name):
+    if name == "User":
+        from .users import User
+        return User
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
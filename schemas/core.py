@@ -1,31 +1,14 @@
 """
-Database Schemas
+Core Schemas
 
-Define your MongoDB collection schemas here using Pydantic models.
-These schemas are used for data validation in your application.
-
-Each Pydantic model represents a collection in your database.
-Model name is converted to lowercase for the collection name:
-- User -> "user" collection
-- Product -> "product" collection
-- BlogPost -> "blogs" collection
+Collections used by the API handlers (Drumkit, Collaborator).
 """
 
-from pydantic import BaseModel, Field, EmailStr, AwareDatetime
+from pydantic import BaseModel, Field, AwareDatetime, conlist, constr
 from typing import Optional, List, Literal
 
 # Core schemas used by the app
 
-class User(BaseModel):
-    """
-    Users collection schema
-    Collection name: "user" (lowercase of class name)
-    """
-    username: str = Field(..., min_length=3, max_length=32, description="Unique username")
-    email: EmailStr
-    display_name: Optional[str] = Field(None, max_length=64)
-    is_active: bool = Field(True)
-
 class Collaborator(BaseModel):
     username: str = Field(..., max_length=32)
     role: Literal["productor", "Ingeniero de audio", "Artista"]
@@ -48,7 +31,7 @@ class Drumkit(BaseModel):
     visibility: Literal["privado", "publico", "no_listado"]
 
     # Metadatos
-    tags: List[str] = Field(default_factory=list, description="Max 3, cada uno <=15 chars")
+    tags: conlist(constr(max_length=15), max_length=3) = Field(default_factory=list, description="Max 3, cada uno <=15 chars")
     sounds_count: int = Field(..., ge=0, le=999)
 
     # Precios
@@ -0,0 +1,19 @@
+"""
+User Schemas
+
+Kept apart from schemas.core because EmailStr needs email-validator, which is listed in
+requirements-optional.txt rather than requirements.txt.
+"""
+
+from pydantic import BaseModel, Field, EmailStr
+from typing import Optional
+
+class User(BaseModel):
+    """
+    Users collection schema
+    Collection name: "user" (lowercase of class name)
+    """
+    username: str = Field(..., min_length=3, max_length=32, description="Unique username")
+    email: EmailStr
+    display_name: Optional[str] = Field(None, max_length=64)
+    is_active: bool = Field(True)
@@ -14,6 +14,22 @@ fi
 mkdir -p logs
 echo "Installing dependencies..."
 pip install -r requirements.txt
+# A stale compiled pricing module would shadow pricing.py, so always start from the source
+rm -f pricing.*.so
+if [ -n "$WORKERS" ]; then
+  echo "Compiling hot helpers with mypyc..."
+  pip install -r requirements-build.txt
+  if ! mypyc pricing.py; then
+    rm -f pricing.*.so
+    echo "mypyc build failed, using pure-Python pricing module"
+  fi
+fi
 echo "Starting FastAPI server..."
-nohup uvicorn main:app --host 0.0.0.0 --port 8000 --reload > logs/server.log 2>&1 
+# Single-process dev server with --reload by default; WORKERS=N opts into N worker processes
+if [ -n "$WORKERS" ]; then
+  UVICORN_OPTS="--workers $WORKERS --limit-concurrency 1000"
+else
+  UVICORN_OPTS="--reload"
+fi
+nohup uvicorn main:app --host 0.0.0.0 --port 8000 --loop uvloop --http httptools $UVICORN_OPTS > logs/server.log 2>&1 
 echo "Server started in background"
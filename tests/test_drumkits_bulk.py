@@ -0,0 +1,22 @@
+from fastapi.testclient import TestClient
+
+import main
+
+client = TestClient(main.app)
+
+
+def _drumkit(i):
+    return {
+        "title": f"Kit {i}",
+        "release_at": "2999-01-01T00:00:00Z",
+        "visibility": "publico",
+        "sounds_count": 10,
+        "price_original": 20.0,
+        "owner_username": "productor",
+    }
+
+
+def test_bulk_rejects_more_than_max_items():
+    payloads = [_drumkit(i) for i in range(main._BULK_MAX_ITEMS + 1)]
+    response = client.post("/drumkits/bulk", json=payloads)
+    assert response.status_code == 413